@@ -0,0 +1,273 @@
+import json
+import shutil
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Union
+
+import jsonschema
+from jsonschema.protocols import Validator
+
+try:
+    from orjson import dumps as json_dumps
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+
+def find_binary(name: str) -> Optional[str]:
+    """Find an MKVToolNix binary on the PATH.
+
+    Args:
+        name (str): The name of the binary without any extension (e.g. `mkvmerge`).
+
+    Returns:
+        Optional[str]: The path to the binary, or None if it could not be found.
+    """
+    if sys.platform.startswith("win"):
+        return shutil.which(f'{name}.exe')
+    return shutil.which(name)
+
+
+MKVMERGE_PATH = find_binary('mkvmerge')
+
+SHAPE_KEYWORDS = {
+    "$schema", "$id", "$comment", "title", "description", "examples", "default", "type",
+    "properties", "additionalProperties", "required", "minProperties", "maxProperties", "items",
+    "minItems", "maxItems",
+}
+MAX_VALID_SHAPES = 1024
+
+_VALID_SHAPES: Dict[Tuple[str, Hashable], bool] = dict()
+
+
+def _is_shape_schema(schema: Any) -> bool:
+    """Check whether a schema only constrains the structure of data (keys, types, and sizes) and
+    never the values themselves.
+
+    Args:
+        schema (Any): The schema (or subschema) to check.
+
+    Returns:
+        bool: Whether validation only depends on the shape of the data.
+    """
+    if isinstance(schema, bool):
+        return True
+    if not isinstance(schema, dict):
+        return False
+    for k, v in schema.items():
+        if k not in SHAPE_KEYWORDS:
+            return False
+        if k == "properties" and not all(_is_shape_schema(i) for i in v.values()):
+            return False
+        if k == "items" and not all(_is_shape_schema(i) for i in (v if isinstance(v, list) else [v])):
+            return False
+        if k == "additionalProperties" and not _is_shape_schema(v):
+            return False
+    return True
+
+
+def shape_fingerprint(data: Any) -> Hashable:
+    """Build a hashable fingerprint of the structure of some JSON data: the keys of objects, the
+    length and contents of arrays, and the type of every leaf, but not the leaf values.  Object keys
+    are ordered by their `repr` so that keys of mixed types can be compared.
+
+    Args:
+        data (Any): The JSON data.
+
+    Returns:
+        Hashable: The fingerprint of the data.
+    """
+    if isinstance(data, dict):
+        return (dict, tuple(sorted(((k, shape_fingerprint(v)) for k, v in data.items()), key=lambda i: repr(i[0]))))
+    if isinstance(data, list):
+        return (list, tuple(shape_fingerprint(i) for i in data))
+    if isinstance(data, float):
+        return (float, data.is_integer())
+    return type(data)
+
+
+@lru_cache(maxsize=None)
+def _compile_schema(schema_key: str) -> Validator:
+    """Build a validator from a canonical (key-sorted) JSON dump of a schema.
+
+    Args:
+        schema_key (str): The canonical JSON representation of the schema.
+
+    Returns:
+        Validator: The validator for the schema.
+    """
+    schema = json.loads(schema_key)
+    cls = jsonschema.validators.validator_for(schema)
+    cls.check_schema(schema)
+    return cls(schema)
+
+
+@lru_cache(maxsize=None)
+def _compile_fast_schema(schema_key: str) -> Optional[Callable[[dict], dict]]:
+    """Generate a `fastjsonschema` validation function from a canonical JSON dump of a schema.
+
+    Args:
+        schema_key (str): The canonical JSON representation of the schema.
+
+    Returns:
+        Optional[Callable[[dict], dict]]: The validation function, or None if `fastjsonschema` is
+            not installed or cannot compile the schema.
+    """
+    if fastjsonschema is None:
+        return None
+    try:
+        return fastjsonschema.compile(json.loads(schema_key))
+    except fastjsonschema.JsonSchemaDefinitionException:
+        return None
+
+
+def get_validator(schema: dict) -> Validator:
+    """Get a validator for a JSON schema.  Structurally identical schemas share the same validator,
+    so the schema is only checked against its meta-schema once.
+
+    Args:
+        schema (dict): The JSON schema.
+
+    Returns:
+        Validator: The validator for the schema.
+    """
+    return _compile_schema(json.dumps(schema, sort_keys=True))
+
+
+def get_fast_validator(schema: dict) -> Optional[Callable[[dict], dict]]:
+    """Get a compiled `fastjsonschema` validation function for a JSON schema.
+
+    Args:
+        schema (dict): The JSON schema.
+
+    Returns:
+        Optional[Callable[[dict], dict]]: The validation function, or None if unavailable.
+    """
+    return _compile_fast_schema(json.dumps(schema, sort_keys=True))
+
+
+@lru_cache(maxsize=None)
+def load_schema(schema_file: Union[Path, str]) -> dict:
+    """Load a JSON schema file.  The file is only read the first time a given path is requested.
+
+    Args:
+        schema_file (Union[Path, str]): The path to the JSON schema file.
+
+    Returns:
+        dict: The JSON schema.
+    """
+    with Path(schema_file).open('r') as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=None)
+def is_shape_schema_file(schema_file: Union[Path, str]) -> bool:
+    """Check whether validation against a JSON schema file only depends on the shape of the data.
+
+    Args:
+        schema_file (Union[Path, str]): The path to the JSON schema file.
+
+    Returns:
+        bool: Whether validation results can be reused for data with the same shape.
+    """
+    return _is_shape_schema(load_schema(schema_file))
+
+
+@lru_cache(maxsize=None)
+def get_file_validator(schema_file: Union[Path, str]) -> Validator:
+    """Get the validator for a JSON schema file.
+
+    Args:
+        schema_file (Union[Path, str]): The path to the JSON schema file.
+
+    Returns:
+        Validator: The validator for the schema.
+    """
+    return get_validator(load_schema(schema_file))
+
+
+@lru_cache(maxsize=None)
+def get_file_fast_validator(schema_file: Union[Path, str]) -> Optional[Callable[[dict], dict]]:
+    """Get the compiled `fastjsonschema` validation function for a JSON schema file.
+
+    Args:
+        schema_file (Union[Path, str]): The path to the JSON schema file.
+
+    Returns:
+        Optional[Callable[[dict], dict]]: The validation function, or None if unavailable.
+    """
+    return get_fast_validator(load_schema(schema_file))
+
+
+def preload_schema(schema_file: Union[Path, str]) -> None:
+    """Build and cache the validators for a JSON schema file ahead of the first validation.
+
+    Args:
+        schema_file (Union[Path, str]): The path to the JSON schema file.
+    """
+    schema_file = str(Path(schema_file).absolute())
+    get_file_validator(schema_file)
+    get_file_fast_validator(schema_file)
+    is_shape_schema_file(schema_file)
+
+
+def validate(data: dict, schema_file: Union[Path, str]) -> None:
+    """Validate data against a JSON schema file.  Behaves like `jsonschema.validate` but reuses the
+    cached validators for the schema file.  Data is checked with the `fastjsonschema` validator when
+    one is available; `jsonschema` is only used to report the error when that check fails.  Without
+    `fastjsonschema`, if the schema only constrains the structure of the data, data with the same
+    shape as previously validated data is accepted without validating it again.
+
+    Args:
+        data (dict): The data to validate.
+        schema_file (Union[Path, str]): The path to the JSON schema file.
+
+    Raises:
+        jsonschema.ValidationError: Raised if the data does not conform to the schema.
+    """
+    schema_file = str(Path(schema_file).absolute())
+    shape_key = None
+    if get_file_fast_validator(schema_file) is None and is_shape_schema_file(schema_file):
+        shape_key = (schema_file, shape_fingerprint(data))
+        if shape_key in _VALID_SHAPES:
+            return
+
+    _validate(data, schema_file)
+
+    if shape_key is not None:
+        if len(_VALID_SHAPES) >= MAX_VALID_SHAPES:
+            _VALID_SHAPES.clear()
+        _VALID_SHAPES[shape_key] = True
+
+
+def _validate(data: dict, schema_file: str) -> None:
+    """Validate data against a JSON schema file without consulting the shape cache.
+
+    Args:
+        data (dict): The data to validate.
+        schema_file (str): The absolute path to the JSON schema file.
+
+    Raises:
+        jsonschema.ValidationError: Raised if the data does not conform to the schema.
+    """
+    fast_validate = get_file_fast_validator(schema_file)
+    if fast_validate is not None:
+        try:
+            fast_validate(data)
+            return
+        except fastjsonschema.JsonSchemaValueException:
+            pass
+
+    validator = get_file_validator(schema_file)
+    error = jsonschema.exceptions.best_match(validator.iter_errors(data))
+    if error is not None:
+        raise error
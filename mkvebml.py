@@ -0,0 +1,275 @@
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+
+EBML_ID = 0x1A45DFA3
+DOC_TYPE_ID = 0x4282
+SEGMENT_ID = 0x18538067
+TRACKS_ID = 0x1654AE6B
+CLUSTER_ID = 0x1F43B675
+TRACK_ENTRY_ID = 0xAE
+TRACK_NUMBER_ID = 0xD7
+TRACK_UID_ID = 0x73C5
+TRACK_TYPE_ID = 0x83
+CODEC_ID_ID = 0x86
+NAME_ID = 0x536E
+LANGUAGE_ID = 0x22B59C
+LANGUAGE_BCP47_ID = 0x22B59D
+FLAG_ENABLED_ID = 0xB9
+FLAG_DEFAULT_ID = 0x88
+FLAG_FORCED_ID = 0x55AA
+
+MAX_HEADER_SIZE = 4 * 1024
+MAX_TRACKS_SIZE = 16 * 1024 * 1024
+
+DOC_TYPES = {
+    "matroska": "Matroska",
+    "webm": "WebM",
+}
+TRACK_TYPES = {
+    1: "video",
+    2: "audio",
+    17: "subtitles",
+    18: "buttons",
+}
+
+
+class EbmlError(Exception):
+    """Raised when a file cannot be read as a Matroska/WebM file."""
+
+
+def _vint_length(first: int) -> int:
+    """Get the length of a variable-size integer from its first byte.
+
+    Args:
+        first (int): The first byte of the integer.
+
+    Returns:
+        int: The length of the integer in bytes.
+
+    Raises:
+        EbmlError: Raised if the integer is longer than 8 bytes.
+    """
+    if first == 0:
+        raise EbmlError("Invalid variable-size integer.")
+    return 9 - first.bit_length()
+
+
+def _decode_vint(data: bytes, keep_marker: bool) -> Optional[int]:
+    """Decode a variable-size integer.
+
+    Args:
+        data (bytes): The bytes of the integer.
+        keep_marker (bool): Keep the length marker bit (used for element IDs).
+
+    Returns:
+        Optional[int]: The value of the integer, or None if it is the reserved 'unknown' value.
+    """
+    value = int.from_bytes(data, "big")
+    if keep_marker:
+        return value
+    value &= (1 << (7 * len(data))) - 1
+    if value == (1 << (7 * len(data))) - 1:
+        return None
+    return value
+
+
+def _read_element_header(f: BinaryIO) -> Tuple[int, Optional[int]]:
+    """Read an element header from a file.
+
+    Args:
+        f (BinaryIO): The file, positioned at the start of an element.
+
+    Returns:
+        Tuple[int, Optional[int]]: The element ID and its data size (None if unknown).
+
+    Raises:
+        EbmlError: Raised if the file ends or the header is invalid.
+    """
+    header = list()
+    for keep_marker in (True, False):
+        first = f.read(1)
+        if not first:
+            raise EbmlError("Unexpected end of file.")
+        length = _vint_length(first[0])
+        data = first + f.read(length - 1)
+        if len(data) != length:
+            raise EbmlError("Unexpected end of file.")
+        header.append(_decode_vint(data, keep_marker))
+    return header[0], header[1]
+
+
+def _iter_elements(data: bytes) -> Iterator[Tuple[int, bytes]]:
+    """Iterate over the child elements stored in an element's data.
+
+    Args:
+        data (bytes): The data of the parent element.
+
+    Yields:
+        Iterator[Tuple[int, bytes]]: The ID and data of each child element.
+
+    Raises:
+        EbmlError: Raised if the data is truncated or contains unknown-size elements.
+    """
+    pos = 0
+    end = len(data)
+    while pos < end:
+        values = list()
+        for keep_marker in (True, False):
+            if pos >= end:
+                raise EbmlError("Truncated element.")
+            length = _vint_length(data[pos])
+            if pos + length > end:
+                raise EbmlError("Truncated element.")
+            values.append(_decode_vint(data[pos:pos + length], keep_marker))
+            pos += length
+        element_id, size = values
+        if size is None or pos + size > end:
+            raise EbmlError("Truncated element.")
+        yield element_id, data[pos:pos + size]
+        pos += size
+
+
+def _string(data: bytes) -> str:
+    """Decode an EBML string element.
+
+    Args:
+        data (bytes): The element data.
+
+    Returns:
+        str: The decoded string.
+    """
+    return data.rstrip(b"\0").decode("utf-8", errors="replace")
+
+
+def _uint(data: bytes) -> int:
+    """Decode an EBML unsigned integer element.
+
+    Args:
+        data (bytes): The element data.
+
+    Returns:
+        int: The decoded integer.
+    """
+    return int.from_bytes(data, "big")
+
+
+def _parse_tracks(data: bytes) -> list:
+    """Convert the contents of a Tracks element to `mkvmerge -i` style track information.
+
+    Args:
+        data (bytes): The data of the Tracks element.
+
+    Returns:
+        list: The track information, with track IDs numbered the way `mkvmerge` does.
+
+    Raises:
+        EbmlError: Raised if a track has no codec, a type `mkvmerge` does not report, a missing or
+            duplicate track number (`mkvmerge` skips those tracks, shifting the IDs of later ones), or
+            a BCP-47 language (which `mkvmerge` reports in place of the legacy language).
+    """
+    tracks = list()
+    numbers = set()
+    for element_id, entry in _iter_elements(data):
+        if element_id != TRACK_ENTRY_ID:
+            continue
+        fields = dict(_iter_elements(entry))
+        track_type = TRACK_TYPES.get(_uint(fields.get(TRACK_TYPE_ID, b"")))
+        if track_type is None or CODEC_ID_ID not in fields:
+            raise EbmlError("Unsupported track.")
+        if LANGUAGE_BCP47_ID in fields:
+            raise EbmlError("Unsupported track language.")
+        number = _uint(fields.get(TRACK_NUMBER_ID, b""))
+        if not number or number in numbers:
+            raise EbmlError("Missing or duplicate track number.")
+        numbers.add(number)
+
+        properties = {
+            "codec_id": _string(fields[CODEC_ID_ID]),
+            "default_track": bool(_uint(fields.get(FLAG_DEFAULT_ID, b"\x01"))),
+            "enabled_track": bool(_uint(fields.get(FLAG_ENABLED_ID, b"\x01"))),
+            "forced_track": bool(_uint(fields.get(FLAG_FORCED_ID, b"\x00"))),
+            "language": _string(fields.get(LANGUAGE_ID, b"eng")),
+            "number": number,
+            "uid": _uint(fields.get(TRACK_UID_ID, b"")),
+        }
+        if NAME_ID in fields:
+            properties["track_name"] = _string(fields[NAME_ID])
+
+        tracks.append({
+            "id": len(tracks),
+            "type": track_type,
+            "properties": properties,
+        })
+    return tracks
+
+
+def _read_info(f: BinaryIO, file_name: str) -> dict:
+    """Read the track information from an open Matroska/WebM file.
+
+    Args:
+        f (BinaryIO): The file, positioned at the start.
+        file_name (str): The name of the file to report.
+
+    Returns:
+        dict: The `mkvmerge -i` style information.
+
+    Raises:
+        EbmlError: Raised if the track information cannot be found.
+    """
+    element_id, size = _read_element_header(f)
+    if element_id != EBML_ID or size is None:
+        raise EbmlError("Not an EBML file.")
+    if size > MAX_HEADER_SIZE:
+        raise EbmlError("Unsupported EBML header.")
+    header = dict(_iter_elements(f.read(size)))
+    container = DOC_TYPES.get(_string(header.get(DOC_TYPE_ID, b"")))
+    if container is None:
+        raise EbmlError("Not a Matroska/WebM file.")
+
+    element_id, size = _read_element_header(f)
+    if element_id != SEGMENT_ID:
+        raise EbmlError("Missing segment.")
+    end = None if size is None else f.tell() + size
+
+    while end is None or f.tell() < end:
+        element_id, size = _read_element_header(f)
+        if element_id == TRACKS_ID:
+            if size is None or size > MAX_TRACKS_SIZE:
+                raise EbmlError("Unsupported track list.")
+            data = f.read(size)
+            if len(data) != size:
+                raise EbmlError("Unexpected end of file.")
+            return {
+                "container": {
+                    "recognized": True,
+                    "supported": True,
+                    "type": container,
+                },
+                "file_name": file_name,
+                "tracks": _parse_tracks(data),
+            }
+        if element_id == CLUSTER_ID or size is None:
+            break
+        f.seek(size, 1)
+    raise EbmlError("No track list before the first cluster.")
+
+
+def read_info(source: Union[Path, str]) -> Optional[dict]:
+    """Read the track information from a Matroska/WebM file without running `mkvmerge`.  Only the
+    element headers in front of the track list and the track list itself are read.
+
+    The result has the same layout as `mkvmerge -i -F json` output, but only contains the
+    container type and the track IDs, types, codec IDs, languages, names, and flags.
+
+    Args:
+        source (Union[Path, str]): The file to read.
+
+    Returns:
+        Optional[dict]: The track information, or None if the file is not a Matroska/WebM file
+            or its track list could not be read.
+    """
+    try:
+        with open(source, "rb") as f:
+            return _read_info(f, str(source))
+    except (OSError, EbmlError):
+        return None
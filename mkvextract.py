@@ -1,21 +1,17 @@
-import json
-import os
-import platform
 import shlex
-import shutil
 import subprocess
 from pathlib import Path
 from typing import Union, Optional
 
-import jsonschema
-from box import Box, BoxList
+from box import Box
 
+from mkvcommon import find_binary, json_loads, preload_schema, validate
 from mkvinfo import MkvInfo
 
-if platform.system() == "Windows":
-    MKVEXTRACT_PATH = shutil.which('mkvextract.exe')
-else:
-    MKVEXTRACT_PATH = shutil.which('mkvextract')
+MKVEXTRACT_PATH = find_binary('mkvextract')
+
+SCHEMA_FILE = Path(__file__).resolve().parent / "schema/mkvextract.schema.json"
+preload_schema(SCHEMA_FILE)
 
 
 class MkvExtract:
@@ -23,12 +19,12 @@ class MkvExtract:
     given source file.
 
     Attributes:
-        data (Box, optional): The data associated with what to extract.
+        data (dict, optional): The data associated with what to extract.
         mkvextract_path (Path): The path to the `mkvextract` binary.
         schema_file (Path): The path to the JSON schema file to validate the data.
         mkvinfo (MkvInfo, optional): The MkvInfo object representing the source file's track information.
     """
-    data: Optional[Box]
+    data: Optional[dict]
     mkvextract_path: Path
     schema_file: Path
     mkvinfo: MkvInfo
@@ -36,9 +32,7 @@ class MkvExtract:
     def __init__(self):
         self.data = None
         self.mkvextract_path = MKVEXTRACT_PATH
-        schema_path = Path(
-            os.path.dirname(os.path.abspath(__file__)))
-        self.schema_file = schema_path / Path("schema/mkvextract.schema.json")
+        self.schema_file = SCHEMA_FILE
         self.mkvinfo = None
 
     def load_from_file(self, json_file: Union[Path, str]):
@@ -48,8 +42,7 @@ class MkvExtract:
             json_file (Union[Path, str]): The path to the JSON file.
         """
         json_file = Path(json_file)
-        with json_file.open('r') as f:
-            data = json.load(f)
+        data = json_loads(json_file.read_bytes())
 
         self.load_from_object(data)
 
@@ -59,12 +52,9 @@ class MkvExtract:
         Args:
             data (Union[dict, Box]): The object to load the `mkvextract` options from.
         """
-        with self.schema_file.open('r') as f:
-            schema = json.load(f)
-
-        jsonschema.validate(data, schema)
-        self.data = Box(data)
-        self.mkvinfo = MkvInfo(source=self.data.source)
+        validate(data, self.schema_file)
+        self.data = data
+        self.mkvinfo = MkvInfo(source=data["source"])
 
     def generate_command(self, as_string: bool = False) -> Union[str, list]:
         """Generate the command line options to run.
@@ -79,7 +69,7 @@ class MkvExtract:
             return None
         command = list()
         command.append(self.mkvextract_path)
-        command.append(self.data.source)
+        command.append(self.data["source"])
         for mode, v in self.data.items():
             if mode == "source":
                 continue
@@ -88,8 +78,7 @@ class MkvExtract:
             if mode in ["attachments", "timestamps", "cues"]:
                 mode = mode if mode != "timestamps" else "timestamps_v2"
                 command.append(mode)
-                for i in v:
-                    command.append(f'{i.id}:{i.filename}')
+                command.extend(f'{i["id"]}:{i["filename"]}' for i in v)
             if mode in ["chapters", "tags"]:
                 command.append(mode)
                 command.append(v)
@@ -108,18 +97,17 @@ class MkvExtract:
         Returns:
             list: The command options for all of the associated tracks to extract.
         """
-        data = BoxList(data)
         command = ["tracks"]
         for d in data:
             search_tags = {"track_type", "language"}
             tags = set(d.keys())
             if s_tags := tags.intersection(search_tags):
                 track = self.mkvinfo.get_tracks(
-                    **{i: d[i] for i in s_tags})[d.id]
+                    **{i: d[i] for i in s_tags})[d["id"]]
             else:
-                track = self.mkvinfo.tracks[d.id]
+                track = self.mkvinfo.tracks[d["id"]]
 
-            command.append(f"{track.track_id}:{d.filename}")
+            command.append(f"{track.track_id}:{d['filename']}")
         return command
 
     def extract(self, verbose: bool = False) -> int:
@@ -1,20 +1,119 @@
-import json
-import platform
-import shutil
 import subprocess
 from pathlib import Path
-from typing import Union, List, Optional
+from typing import Union, List, Optional, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
 
-from box import Box
+from mkvcommon import MKVMERGE_PATH, json_loads
+from mkvebml import read_info
 
-if platform.system() == "Windows":
-    MKVMERGE_PATH = shutil.which('mkvmerge.exe')
-else:
-    MKVMERGE_PATH = shutil.which('mkvmerge')
 
+class _IdentifyFailed(Exception):
+    """Raised to keep failed `mkvmerge -i` runs out of the identify cache."""
 
-@dataclass
+    def __init__(self, output: bytes) -> None:
+        super().__init__()
+        self.output = output
+
+
+def _run_identify(source: str) -> Tuple[int, bytes]:
+    """Run `mkvmerge -i` on a file.
+
+    Args:
+        source (str): The file to identify.
+
+    Returns:
+        Tuple[int, bytes]: The return code and the JSON output from `mkvmerge`.
+    """
+    command = [MKVMERGE_PATH, '-i', source, '-F', 'json']
+    with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=1 << 20) as p:
+        output, _ = p.communicate()
+    return p.returncode, output
+
+
+@lru_cache(maxsize=256)
+def _identify(source: str, mtime_ns: int, size: int) -> bytes:
+    """Run `mkvmerge -i` on a file, caching successful results.  The modification time and size
+    are part of the cache key so that changed files are identified again.
+
+    Args:
+        source (str): The resolved path of the file to identify.
+        mtime_ns (int): The modification time of the file.
+        size (int): The size of the file.
+
+    Returns:
+        bytes: The JSON output from `mkvmerge`.
+
+    Raises:
+        _IdentifyFailed: Raised if `mkvmerge` returns a non-zero exit code.
+    """
+    returncode, output = _run_identify(source)
+    if returncode != 0:
+        raise _IdentifyFailed(output)
+    return output
+
+
+def _identify_output(source: Union[Path, str]) -> bytes:
+    """Get the `mkvmerge -i` JSON output for a file.  Results are reused until the file's
+    modification time or size changes.
+
+    Args:
+        source (Union[Path, str]): The file to identify.
+
+    Returns:
+        bytes: The JSON output from `mkvmerge`.
+    """
+    source = Path(source)
+    try:
+        st = source.stat()
+    except OSError:
+        return _run_identify(str(source))[1]
+
+    try:
+        return _identify(str(source.resolve()), st.st_mtime_ns, st.st_size)
+    except _IdentifyFailed as e:
+        return e.output
+
+
+def identify(source: Union[Path, str]) -> dict:
+    """Get the `mkvmerge -i` information for a file.
+
+    Args:
+        source (Union[Path, str]): The file to identify.
+
+    Returns:
+        dict: The JSON data from `mkvmerge`.
+    """
+    return json_loads(_identify_output(source))
+
+
+def identify_tracks(source: Union[Path, str]) -> list:
+    """Get the track list for a file.  The track list of Matroska/WebM files is read directly from
+    the file; any other file (or a Matroska file that cannot be read that way) is identified with
+    `mkvmerge -i`.
+
+    Only the track IDs, types, and the codec ID, language, name, and flag properties are guaranteed
+    to be present; use `identify` for everything else `mkvmerge` reports.
+
+    Args:
+        source (Union[Path, str]): The file to get the tracks for.
+
+    Returns:
+        list: The tracks in `mkvmerge -i` format.
+    """
+    info = read_info(source)
+    if info is not None:
+        return info["tracks"]
+    return identify(source).get("tracks", list())
+
+
+def clear_identify_cache() -> None:
+    """Forget all cached `mkvmerge -i` results.
+    """
+    _identify.cache_clear()
+
+
+@dataclass(slots=True)
 class MkvInfoTrack:
     """Matroska track information.
 
@@ -35,12 +134,10 @@ class MkvInfo:
     Attributes:
         source (Path): The source file to get the information for.
         mkvmerge_path (Path): The path to the `mkvmerge` binary.
-        info (Box): The JSON data from `mkvmerge`.
         tracks (List[MkvInfoTrack]): All of the track information from the source file.
     """
     source: Path
     mkvmerge_path: Path
-    info: Box
     tracks: List[MkvInfoTrack]
 
     def __init__(self, source: Union[Path, str]):
@@ -51,33 +148,56 @@ class MkvInfo:
         """
         self.source = Path(source)
         self.mkvmerge_path = MKVMERGE_PATH
-        self.info = self.get_info()
+        self.__info = None
         self.tracks = self.process_info()
 
-    def get_info(self) -> Box:
+    def get_info(self) -> dict:
         """Get the 'identify' information for the track.
 
         Returns:
-            Box: The information loaded from the `mkvmerge` JSON.
+            dict: The information loaded from the `mkvmerge` JSON.
+        """
+        return identify(self.source)
+
+    @property
+    def info(self) -> dict:
+        """Returns the JSON data from `mkvmerge`, running `mkvmerge` the first time it is accessed.
+
+        Returns:
+            dict: The information loaded from the `mkvmerge` JSON.
         """
-        command = [MKVMERGE_PATH, '-i', str(self.source), '-F', 'json']
-        output = subprocess.run(command, capture_output=True)
-        return Box(json.loads(output.stdout))
+        if self.__info is None:
+            self.__info = self.get_info()
+        return self.__info
+
+    @info.setter
+    def info(self, info: dict) -> None:
+        """Set the JSON data from `mkvmerge`.
+
+        Args:
+            info (dict): The information loaded from the `mkvmerge` JSON.
+        """
+        self.__info = info
 
     def process_info(self) -> List[MkvInfoTrack]:
-        """Process the information from the `mkvmerge` command and return a list of MkvInfoTracks.
+        """Process the track information for the source and return a list of MkvInfoTracks.  The
+        track list is read directly from Matroska/WebM files when possible (see `identify_tracks`).
 
         Returns:
             List[MkvInfoTrack]: All of the tracks associated with the source.
         """
         tracks = list()
-        for i in self.info.tracks:
-            lang = getattr(i.properties, "language", None)
+        if self.__info is not None:
+            track_list = self.__info.get("tracks", list())
+        else:
+            track_list = identify_tracks(self.source)
+        for i in track_list:
+            properties = i["properties"]
             track = MkvInfoTrack(
-                track_id=i.id,
-                track_type=i.type,
-                track_lang=lang,
-                track_codec=i.properties.codec_id
+                track_id=i["id"],
+                track_type=i["type"],
+                track_lang=properties.get("language"),
+                track_codec=properties["codec_id"]
             )
             tracks.append(track)
         return tracks
@@ -95,9 +215,7 @@ class MkvInfo:
         if not track_type and not language:
             return self.tracks
 
-        tracks = self.tracks
-        if track_type:
-            tracks = [i for i in self.tracks if i.track_type == track_type]
-        if language:
-            tracks = [i for i in tracks if i.track_lang == language]
-        return tracks
+        return [
+            i for i in self.tracks
+            if (not track_type or i.track_type == track_type) and (not language or i.track_lang == language)
+        ]
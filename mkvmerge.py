@@ -1,25 +1,24 @@
-import json
 import logging
 import os
-import platform
 import shlex
-import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from itertools import chain
 from pathlib import Path
-from tempfile import NamedTemporaryFile
+from tempfile import mkstemp
 from typing import Iterable, List, Optional, Union
 
-import box
-import jsonschema
-from box import Box, BoxList
+from box import Box
 
-if platform.system() == "Windows":
-    MKVMERGE_PATH = shutil.which('mkvmerge.exe')
-else:
-    MKVMERGE_PATH = shutil.which('mkvmerge')
-logging.debug(
-    f"Found 'mkvmerge' binary ({platform.system()}): {MKVMERGE_PATH}")
+from mkvcommon import MKVMERGE_PATH, json_dumps, json_loads, preload_schema, validate
+from mkvinfo import clear_identify_cache, identify, identify_tracks
+
+logging.debug(f"Found 'mkvmerge' binary: {MKVMERGE_PATH}")
+
+SCHEMA_FILE = Path(__file__).resolve().parent / "schema/mkvmerge.schema.json"
+preload_schema(SCHEMA_FILE)
 
 
 class MkvSourceTrack:
@@ -72,15 +71,17 @@ class MkvSource:
 
     Attributes:
         source_file (Path): The source file to mux from.
-        info (Box): `mkvmerge -i` information associated with the source and associated tracks.
+        info (dict): `mkvmerge -i` information associated with the source and associated tracks.
+            Loaded the first time it is accessed.
+        track_info (list): The track list of the source (IDs, types, codecs, languages, names, and
+            flags).  Loaded the first time it is accessed.
         verify_files (bool): Whether to verify that the source files exist.
     """
     source_file: Path
-    info: Box
     __tracks: List[MkvSourceTrack]
-    options: Box
+    options: dict
 
-    def __init__(self, filename: Union[str, Path], options: Optional[Box] = None, verify_files: bool = False) -> None:
+    def __init__(self, filename: Union[str, Path], options: Optional[dict] = None, verify_files: bool = False) -> None:
         """Create a Matroska source object.
 
         Args:
@@ -88,14 +89,13 @@ class MkvSource:
             verify_files (bool): Verify that the source file exists. Defaults to False.
         """
         self.source_file = Path(filename)
-        self.options = options if options else Box()
+        self.options = options if options else dict()
         if not self.source_file.exists() and verify_files:
             logging.fatal(f"Source does not exist: '{self.source_file}'!")
             sys.exit(10)
         else:
             logging.debug(f"Found source: '{self.source_file}'.")
         self.__tracks = list()
-        self.get_info()
 
     def add_track(self, track: MkvSourceTrack) -> None:
         """Add an MkvSourceTrack to the source
@@ -116,12 +116,83 @@ class MkvSource:
         except ValueError:
             pass
 
-    def get_info(self) -> None:
-        """Get the 'identify' information for the track.
+    def get_info(self) -> dict:
+        """Get (or refresh) the 'identify' information for the track.
+
+        Returns:
+            dict: The 'identify' information for the source.
         """
-        command = [MKVMERGE_PATH, '-i', str(self.source_file), '-F', 'json']
-        output = subprocess.run(command, capture_output=True)
-        self.info = Box(json.loads(output.stdout))
+        self.info = self.identify()
+        self.track_info = self.info.get("tracks", list())
+        return self.info
+
+    def identify(self) -> dict:
+        """Run `mkvmerge -i` on the source without storing the result on the source.  Results are
+        cached per file and reused until the file's modification time or size changes.
+
+        Returns:
+            dict: The 'identify' information for the source.
+        """
+        return identify(self.source_file)
+
+    def identify_tracks(self) -> list:
+        """Get the track list of the source without storing the result on the source.  The track
+        list of Matroska/WebM files is read directly from the file instead of running `mkvmerge`.
+
+        Returns:
+            list: The tracks of the source in `mkvmerge -i` format.
+        """
+        return identify_tracks(self.source_file)
+
+    @cached_property
+    def info(self) -> dict:
+        """Returns the `mkvmerge -i` information for the source, running `mkvmerge` the first time
+        it is accessed.
+
+        Returns:
+            dict: The 'identify' information for the source.
+        """
+        return self.get_info()
+
+    @cached_property
+    def track_info(self) -> list:
+        """Returns the track list for the source.  Reuses `info` if it has already been loaded.
+
+        Returns:
+            list: The tracks of the source in `mkvmerge -i` format.
+        """
+        if "info" in self.__dict__:
+            return self.info.get("tracks", list())
+        return self.identify_tracks()
+
+    def _set_track_info(self, track_info: list) -> None:
+        """Store a freshly identified track list and drop the cached `mkvmerge -i` information so
+        that it is reloaded the next time it is accessed.
+
+        Args:
+            track_info (list): The tracks of the source in `mkvmerge -i` format.
+        """
+        self.__dict__.pop("info", None)
+        self.track_info = track_info
+
+    @property
+    def source_file(self) -> Path:
+        """Returns the source file to mux from.
+
+        Returns:
+            Path: The source file.
+        """
+        return self.__source_file
+
+    @source_file.setter
+    def source_file(self, filename: Union[str, Path]) -> None:
+        """Set the source file to mux from.
+
+        Args:
+            filename (Union[str, Path]): The source filename.
+        """
+        self.__source_file = Path(filename)
+        self.__source_file_absolute = str(self.__source_file.absolute())
 
     @property
     def tracks(self) -> List[MkvSourceTrack]:
@@ -139,40 +210,41 @@ class MkvSource:
         Returns:
             list: List of all options for the source/tracks.
         """
-        track_count = {
-            "video": list(),
-            "audio": list(),
-            "subtitles": list(),
-            "buttons": list(),
+        videos, audios, subtitles, buttons = list(), list(), list(), list()
+        selected = {
+            "video": videos,
+            "audio": audios,
+            "subtitles": subtitles,
+            "buttons": buttons,
         }
-        command = list()
+        track_types = {t["id"]: t["type"] for t in self.track_info}
+        track_options = list()
         for track in self.__tracks:
             try:
-                track_type = self.info.tracks[track.track].type
-            except box.BoxKeyError as e:
+                track_type = track_types[track.track]
+            except KeyError:
                 logging.fatal(
                     f"Source '{self.source_file}' does not contain track number {track.track}!")
                 sys.exit(60)
-
-            track_count[track_type].append(track.track)
-            for k, v in track.options.items():
-                if v is not None:
-                    command.extend([f"--{k}", f"{track.track}:{v}"])
-                else:
-                    command.extend([f"--{k}"])
-        command.extend(("(", f"{self.source_file.absolute()}", ")"))
+            selected[track_type].append(track.track)
+            track_options.extend(
+                (f"--{k}", f"{track.track}:{v}") if v is not None else (f"--{k}",)
+                for k, v in track.options.items()
+            )
 
         pc = list()
-        for k, v in track_count.items():
-            if f"_copy-{k}-tracks" in self.options.keys():
+        for k, option, v in (
+            ("video", "--video-tracks", videos),
+            ("audio", "--audio-tracks", audios),
+            ("subtitles", "--subtitle-tracks", subtitles),
+            ("buttons", "--button-tracks", buttons),
+        ):
+            if f"_copy-{k}-tracks" in self.options:
                 continue
             if not v:
                 pc.append(f'--no-{k}')
             else:
-                if k in ["subtitles", "buttons"]:
-                    k = k[:-1]
-                pc.append(f'--{k}-tracks')
-                pc.append(','.join([str(i) for i in v]))
+                pc.extend((option, ','.join(map(str, v))))
 
         for k, v in self.options.items():
             if k[0] == "_":
@@ -182,7 +254,22 @@ class MkvSource:
             else:
                 pc.extend((f'--{k}', v))
 
-        return pc + command
+        pc.extend(chain.from_iterable(track_options))
+        pc.extend(("(", self.__source_file_absolute, ")"))
+        return pc
+
+    def _command_state(self) -> tuple:
+        """Returns a snapshot of everything `generate_options` depends on.
+
+        Returns:
+            tuple: The state of the source and its tracks.
+        """
+        return (
+            self.__source_file_absolute,
+            self.track_info,
+            tuple(self.options.items()),
+            tuple((t.track, tuple(t.options.items())) for t in self.__tracks),
+        )
 
 
 class MkvAttachment:
@@ -215,6 +302,25 @@ class MkvAttachment:
             sys.exit(70)
         self.mimetype = mimetype
 
+    @property
+    def filename(self) -> Path:
+        """Returns the file to attach.
+
+        Returns:
+            Path: The file to attach.
+        """
+        return self.__filename
+
+    @filename.setter
+    def filename(self, filename: Union[str, Path]) -> None:
+        """Set the file to attach.
+
+        Args:
+            filename (Union[str, Path]): The file to attach.
+        """
+        self.__filename = Path(filename)
+        self.__filename_absolute = str(self.__filename.absolute())
+
     def generate_options(self) -> list:
         """
         Generate all options associated with the attachment.
@@ -226,7 +332,7 @@ class MkvAttachment:
             "--attachment-name",
             self.name,
             "--attach-file",
-            str(self.filename.absolute()),
+            self.__filename_absolute,
         ]
 
         if self.mimetype:
@@ -236,6 +342,14 @@ class MkvAttachment:
 
         return options
 
+    def _command_state(self) -> tuple:
+        """Returns a snapshot of everything `generate_options` depends on.
+
+        Returns:
+            tuple: The state of the attachment.
+        """
+        return (self.__filename_absolute, self.name, self.mimetype)
+
 
 class MkvMerge:
     """A class that contains all the sources, attachments, and options required to create an
@@ -269,9 +383,47 @@ class MkvMerge:
         self.output = None
         self.mkvmerge_path = MKVMERGE_PATH
         self.global_options = dict()
-        schema_path = Path(
-            os.path.dirname(os.path.abspath(__file__)))
-        self.schema_file = schema_path / Path("schema/mkvmerge.schema.json")
+        self.schema_file = SCHEMA_FILE
+        self.__command = None
+        self.__command_state = None
+
+    @property
+    def mkvmerge_path(self) -> Optional[Union[str, Path]]:
+        """Returns the path to the `mkvmerge` binary.
+
+        Returns:
+            Optional[Union[str, Path]]: The path to the `mkvmerge` binary.
+        """
+        return self.__mkvmerge_path
+
+    @mkvmerge_path.setter
+    def mkvmerge_path(self, mkvmerge_path: Optional[Union[str, Path]]) -> None:
+        """Set the path to the `mkvmerge` binary.
+
+        Args:
+            mkvmerge_path (Union[str, Path], optional): The path to the `mkvmerge` binary.
+        """
+        self.__mkvmerge_path = mkvmerge_path
+        self.__mkvmerge_path_str = str(mkvmerge_path)
+
+    @property
+    def output(self) -> Optional[Path]:
+        """Returns the output file to mux to.
+
+        Returns:
+            Optional[Path]: The output file, or None if it has not been set.
+        """
+        return self.__output
+
+    @output.setter
+    def output(self, output: Optional[Union[str, Path]]) -> None:
+        """Set the output file to mux to.
+
+        Args:
+            output (Union[str, Path], optional): The output file.
+        """
+        self.__output = Path(output) if output is not None else None
+        self.__output_absolute = str(self.__output.absolute()) if output is not None else None
 
     def load_from_file(self, json_file: Union[Path, str]):
         """Load all of the relevant Matroska information from a JSON file.
@@ -283,16 +435,27 @@ class MkvMerge:
         if not json_file.exists():
             logging.fatal(f"Cannot open JSON file: '{json_file}'!")
             sys.exit(10)
-        with json_file.open('r') as f:
-            data = json.load(f)
+        data = json_loads(json_file.read_bytes())
 
         self.load_from_object(data)
 
+    @staticmethod
+    def clear_source_information_cache() -> None:
+        """Forget all cached `mkvmerge -i` results so that sources are identified again even if
+        their files have not changed.
+        """
+        clear_identify_cache()
+
     def reload_source_information(self) -> None:
-        """Regenerate source information for all attached sources.
+        """Regenerate the track lists for all attached sources.  Sources are identified in
+        parallel; the full `mkvmerge -i` information is reloaded the next time it is accessed.
         """
-        for source in self.sources:
-            source.get_info()
+        if not self.sources:
+            return
+        with ThreadPoolExecutor(max_workers=min(8, len(self.sources))) as executor:
+            track_infos = list(executor.map(lambda s: s.identify_tracks(), self.sources))
+        for source, track_info in zip(self.sources, track_infos):
+            source._set_track_info(track_info)
 
     def load_from_object(self, json_data: Union[Box, dict]):
         """Load all of the relevant Matroska information from a dict.
@@ -300,24 +463,21 @@ class MkvMerge:
         Args:
             json_data (Union[Box, dict]): The data to load.
         """
-        with self.schema_file.open('r') as f:
-            schema = json.load(f)
-
-        jsonschema.validate(json_data, schema)
-
-        json_data = Box(json_data)
-        self.sources = [MkvSource(**source) for source in json_data.sources]
-        for track in json_data.tracks:
-            source_track = MkvSourceTrack(track.track, track.options)
-            self.sources[track.source].add_track(source_track)
-        self.output = Path(json_data.output_file)
-        self.global_options = getattr(json_data, "options", dict())
+        validate(json_data, self.schema_file)
+
+        self.sources = [MkvSource(**source) for source in json_data["sources"]]
+        self.reload_source_information()
+        for track in json_data["tracks"]:
+            source_track = MkvSourceTrack(track["track"], track.get("options"))
+            self.sources[track["source"]].add_track(source_track)
+        self.output = Path(json_data["output_file"])
+        self.global_options = json_data.get("options", dict())
         self.attachments = [MkvAttachment(
-            **i) for i in getattr(json_data, "attachments", list())]
+            **i) for i in json_data.get("attachments", list())]
         for attach_dir in json_data.get("attachment_directories", list()):
             self.attachments.extend(self.add_attachment_directory(attach_dir))
         self.track_order_override = [
-            f'{i.source}:{i.track}' for i in json_data.tracks]
+            f'{i["source"]}:{i["track"]}' for i in json_data["tracks"]]
 
     def add_attachment_directory(self, dir: Union[Path, str]) -> Iterable[MkvAttachment]:
         """Load all files from a directory as attachments.
@@ -328,9 +488,10 @@ class MkvMerge:
         Yields:
             Iterator[Iterable[MkvAttachment]]: An iterator of MkvAttachments.
         """
-        files = (f for f in Path(dir).glob('*') if f.is_file())
-        for f in files:
-            yield MkvAttachment(filename=f)
+        with os.scandir(dir) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    yield MkvAttachment(filename=entry.path)
 
     def add_source(self, source: MkvSource) -> None:
         """Add an MkvSource to mux into the Matroska file
@@ -358,23 +519,60 @@ class MkvMerge:
         """
         if self.track_order_override:
             return self.track_order_override
-        temp = list()
-        for i in range(0, len(self.sources)):
-            for j in self.sources[i].tracks:
-                temp.append(f"{i}:{j.track}")
-        return temp
+        return [f"{i}:{j.track}" for i, source in enumerate(self.sources) for j in source.tracks]
 
-    def generate_command(self, as_string: bool = False) -> Union[list, str]:
+    def generate_command(self, as_string: bool = False, include_binary: bool = True) -> Union[list, str]:
         """Generate a list of options to feed the 'mkvmerge' binary.
 
         Args:
             as_string (bool): Return the CLI options as a string. Defaults to False.
+            include_binary (bool): Start the command with the path to the 'mkvmerge' binary. Defaults to True.
 
         Returns:
             Union[list, str]: A list/string of 'mkvmerge' CLI options.
+
+        Raises:
+            ValueError: Raised if no output file has been set.
+        """
+        state = self._command_state()
+        if self.__command is None or state != self.__command_state:
+            self.__command = self._build_command()
+            self.__command_state = state
+        full_command = list(self.__command) if include_binary else self.__command[1:]
+
+        if as_string:
+            return shlex.join(full_command)
+        return full_command
+
+    def _command_state(self) -> tuple:
+        """Returns a snapshot of everything `generate_command` depends on.  The generated command is
+        reused until this changes.
+
+        Returns:
+            tuple: The state of the muxing job.
+        """
+        return (
+            self.__mkvmerge_path_str,
+            self.__output_absolute,
+            tuple(self.global_options.items()),
+            tuple(self.track_order_override),
+            tuple(source._command_state() for source in self.sources),
+            tuple(attachment._command_state() for attachment in self.attachments),
+        )
+
+    def _build_command(self) -> list:
+        """Build the list of options to feed the 'mkvmerge' binary.
+
+        Returns:
+            list: A list of 'mkvmerge' CLI options.
+
+        Raises:
+            ValueError: Raised if no output file has been set.
         """
-        full_command = [str(self.mkvmerge_path)]
-        full_command.extend(["--output", f"{self.output.absolute()}"])
+        if self.output is None:
+            raise ValueError("No output file set for 'mkvmerge'.")
+        full_command = [self.__mkvmerge_path_str]
+        full_command.extend(["--output", self.__output_absolute])
         for k, v in self.global_options.items():
             if not v:
                 full_command.append(f"--{k}")
@@ -385,9 +583,6 @@ class MkvMerge:
         for attachment in self.attachments:
             full_command.extend(attachment.generate_options())
         full_command.extend(["--track-order", ",".join(self.track_order)])
-
-        if as_string:
-            return shlex.join(full_command)
         return full_command
 
     def mux(
@@ -405,30 +600,35 @@ class MkvMerge:
 
         Returns:
             int: The status code of the `mkvmerge` mux.
+
+        Raises:
+            ValueError: Raised if no output file has been set.
         """
         # command = self.generate_command()
         # results = subprocess.run(command)
         # return results.returncode
+        options = self.generate_command(include_binary=False)
         if not filename:
-            output_file = NamedTemporaryFile(mode="w", delete=False)
+            fd, options_file = mkstemp(suffix=".json")
         else:
-            output_file = Path("output.json").open("w")
-        command = f'"{self.mkvmerge_path}" "@{output_file.name}"'
+            options_file = str(filename)
+            fd = os.open(options_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        command = [self.__mkvmerge_path_str, f"@{options_file}"]
         if verbose:
-            print(command)
-            print(f"Creating temp file: {output_file.name}")
-        with output_file as f:
-            json.dump(self.generate_command()[1:], f)
+            print(shlex.join(command))
+            print(f"Creating temp file: {options_file}")
+        with open(fd, "wb") as f:
+            f.write(json_dumps(options))
         if verbose:
-            results = subprocess.run(shlex.split(command))
+            results = subprocess.run(command)
         else:
             results = subprocess.run(
-                shlex.split(command),
+                command,
                 stdout=subprocess.DEVNULL,
                 stderr=subprocess.DEVNULL,
             )
         if delete_temp:
-            Path(output_file.name).unlink()
+            Path(options_file).unlink()
         return results.returncode
 
 
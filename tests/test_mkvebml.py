@@ -0,0 +1,136 @@
+from pathlib import Path
+
+import pytest
+
+import mkvinfo
+from mkvebml import read_info
+
+EBML = 0x1A45DFA3
+DOC_TYPE = 0x4282
+SEGMENT = 0x18538067
+SEEK_HEAD = 0x114D9B74
+INFO = 0x1549A966
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+CLUSTER = 0x1F43B675
+CRC32 = 0xBF
+VOID = 0xEC
+
+UNKNOWN_SIZE = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+
+
+def size(n: int) -> bytes:
+    length = 1
+    while n >= (1 << (7 * length)) - 1:
+        length += 1
+    return ((1 << (7 * length)) | n).to_bytes(length, "big")
+
+
+def element(element_id: int, data: bytes) -> bytes:
+    return element_id.to_bytes((element_id.bit_length() + 7) // 8, "big") + size(len(data)) + data
+
+
+def uint(n: int) -> bytes:
+    return n.to_bytes(max(1, (n.bit_length() + 7) // 8), "big")
+
+
+def track(number: int, track_type: int, codec: str, *children: bytes) -> bytes:
+    return element(TRACK_ENTRY, b"".join((
+        element(0xD7, uint(number)),
+        element(0x73C5, uint(1000 + number)),
+        element(0x83, uint(track_type)),
+        element(0x86, codec.encode()),
+    ) + children))
+
+
+def language(lang: str) -> bytes:
+    return element(0x22B59C, lang.encode())
+
+
+def header(doc_type: bytes = b"matroska") -> bytes:
+    return element(EBML, element(0x4286, uint(1)) + element(DOC_TYPE, doc_type))
+
+
+def cluster() -> bytes:
+    return element(CLUSTER, element(0xE7, uint(0)))
+
+
+def write(tmp_path: Path, data: bytes) -> Path:
+    path = tmp_path / "test.mkv"
+    path.write_bytes(data)
+    return path
+
+
+def test_reads_tracks(tmp_path):
+    tracks = element(TRACKS, b"".join((
+        track(1, 1, "V_MPEG4/ISO/AVC", language("und")),
+        track(2, 2, "A_AAC", language("jpn"), element(0x536E, b"Japanese")),
+        track(3, 2, "A_AC3"),
+        track(4, 17, "S_TEXT/ASS", language("eng"), element(0x55AA, uint(1))),
+    )))
+    path = write(tmp_path, header() + element(SEGMENT, tracks + cluster()))
+
+    info = read_info(path)
+
+    assert info["container"]["type"] == "Matroska"
+    assert [(t["id"], t["type"], t["properties"]["language"]) for t in info["tracks"]] == [
+        (0, "video", "und"),
+        (1, "audio", "jpn"),
+        (2, "audio", "eng"),
+        (3, "subtitles", "eng"),
+    ]
+    assert info["tracks"][1]["properties"]["track_name"] == "Japanese"
+    assert info["tracks"][3]["properties"]["forced_track"] is True
+
+
+def test_unknown_size_segment(tmp_path):
+    body = element(INFO, element(0x2AD7B1, uint(1000000))) + element(TRACKS, track(1, 2, "A_AAC")) + cluster()
+    path = write(tmp_path, header() + SEGMENT.to_bytes(4, "big") + UNKNOWN_SIZE + body)
+
+    info = read_info(path)
+
+    assert [t["type"] for t in info["tracks"]] == ["audio"]
+
+
+def test_skips_crc32_and_void_elements(tmp_path):
+    entry = track(1, 2, "A_AAC", language("fre"), element(VOID, b"\x00" * 3))
+    tracks = element(TRACKS, element(CRC32, b"\x00" * 4) + entry + element(VOID, b"\x00" * 8))
+    body = element(CRC32, b"\x00" * 4) + element(SEEK_HEAD, b"\x00" * 10) + element(VOID, b"\x00" * 5) + tracks
+    path = write(tmp_path, header() + element(SEGMENT, body + cluster()))
+
+    info = read_info(path)
+
+    assert len(info["tracks"]) == 1
+    assert info["tracks"][0]["properties"]["language"] == "fre"
+
+
+def test_webm(tmp_path):
+    path = write(tmp_path, header(b"webm") + element(SEGMENT, element(TRACKS, track(1, 1, "V_VP9"))))
+
+    assert read_info(path)["container"]["type"] == "WebM"
+
+
+@pytest.mark.parametrize("data", [
+    pytest.param(header() + element(SEGMENT, element(TRACKS, track(1, 3, "V_COMPLEX"))), id="unsupported-track-type"),
+    pytest.param(header() + element(SEGMENT, element(TRACKS, track(1, 2, "A_AAC", element(0x22B59D, b"ja")))), id="bcp47-language"),
+    pytest.param(header() + element(SEGMENT, cluster() + element(TRACKS, track(1, 2, "A_AAC"))), id="cluster-before-tracks"),
+    pytest.param(header(b"notmatroska") + element(SEGMENT, element(TRACKS, track(1, 2, "A_AAC"))), id="unknown-doc-type"),
+    pytest.param(header() + element(SEGMENT, element(TRACKS, track(1, 2, "A_AAC")))[:-4], id="truncated"),
+    pytest.param(header() + element(SEGMENT, element(TRACKS, element(TRACK_ENTRY, b"".join((
+        element(0x83, uint(2)),
+        element(0x86, b"A_AAC"),
+    ))) + track(2, 2, "A_AC3"))), id="missing-track-number"),
+    pytest.param(header() + element(SEGMENT, element(TRACKS, track(1, 2, "A_AAC") + track(1, 2, "A_AC3"))), id="duplicate-track-number"),
+    pytest.param(b"RIFF\x00\x00\x00\x00AVI ", id="not-ebml"),
+    pytest.param(EBML.to_bytes(4, "big") + b"\x01\x7f\xff\xff\xff\xff\xff\xfe", id="huge-ebml-header"),
+])
+def test_unreadable_files(tmp_path, data):
+    assert read_info(write(tmp_path, data)) is None
+
+
+def test_identify_tracks_falls_back_to_mkvmerge(tmp_path, monkeypatch):
+    path = write(tmp_path, header() + element(SEGMENT, element(TRACKS, track(1, 2, "A_AAC", element(0x22B59D, b"ja")))))
+    tracks = [{"id": 0, "type": "audio", "properties": {"codec_id": "A_AAC", "language": "jpn"}}]
+    monkeypatch.setattr(mkvinfo, "identify", lambda source: {"tracks": tracks})
+
+    assert mkvinfo.identify_tracks(path) == tracks